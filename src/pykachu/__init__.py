@@ -3,7 +3,7 @@
     :start-after: Pykachu
 """
 
-from .pykachu import register_support_class, deregister_support_class, parse, serialize, SupportInterface
+from .pykachu import register_support_class, deregister_support_class, matcher, parse, serialize, serialize_json, SupportInterface
 from . import support
 
-__all__ = ["register_support_class", "deregister_support_class", "parse", "serialize", "SupportInterface", "support"]
\ No newline at end of file
+__all__ = ["register_support_class", "deregister_support_class", "matcher", "parse", "serialize", "serialize_json", "SupportInterface", "support"]
\ No newline at end of file
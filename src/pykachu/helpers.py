@@ -1,7 +1,14 @@
 from enum import Enum
+import dataclasses
+from .pykachu import matcher
 
+@matcher
 def is_enum(datatype: type):
     try:
         return datatype == Enum or issubclass(datatype, Enum)
     except:
-        return False
\ No newline at end of file
+        return False
+
+@matcher
+def is_dataclass(datatype: type):
+    return dataclasses.is_dataclass(datatype)
\ No newline at end of file
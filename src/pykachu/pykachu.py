@@ -1,28 +1,65 @@
 from abc import ABC, abstractmethod
 import typing as tp
-import inspect
+import types
 import json
+import math
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 T = tp.TypeVar('T')
 
-__GLOBAL_SUPPORT_REGISTER: dict[type | tp.Callable[[tp.Type], bool], tp.Type['SupportInterface']] = {}
+# (serialize, parse) functions of a registered SupportInterface
+_SupportEntry = tuple[tp.Callable[[tp.Any], tp.Any], tp.Callable[[type, tp.Any, bool], tp.Any]]
 
-def __is_valid_callable(data_type):
-    if callable(data_type):
-        try:
-            inspect.signature(data_type)
-        except:
-            return False
-        return data_type.__name__.startswith("is_")
-    else:
-        return False
+__GLOBAL_SUPPORT_REGISTER: dict[type | tp.Callable[[tp.Type], bool], _SupportEntry] = {}
+_CALLABLE_MATCHERS: list[tuple[tp.Callable[[tp.Type], bool], _SupportEntry]] = []
+# keyed by equality, so an entry must suit every alias equal to its key (Union[int, str] == Union[str, int])
+# parse functions swapped in by `_PARSE_SPECIALIZERS` must read args from the data_type they're called with
+_RESOLVER_CACHE: dict[type, tp.Optional[_SupportEntry]] = {}
+# registered parse function -> function returning an entry specialized for a data_type it resolved, or None
+_PARSE_SPECIALIZERS: dict[tp.Callable[[type, tp.Any, bool], tp.Any], tp.Callable[[tp.Any], tp.Optional[_SupportEntry]]] = {}
+# parse functions for plain leaf types, checked before any other dispatch in `parse`
+_LEAF_TYPES = frozenset({int, float, str, bool, tp.Any})
+_LEAF_FASTPATH: dict[type, tp.Callable[[type, tp.Any, bool], tp.Any]] = {}
+_REGISTRY_VERSION = 0
+_JSON_PRIMITIVES = frozenset({str, int, float, bool, type(None)})
+# serialize functions of support classes which already return the tree `serialize` would build from their result
+_JSONABLE_SERIALIZERS: set[tp.Callable[[tp.Any], tp.Any]] = set()
+
+def matcher(fn: tp.Callable[[tp.Type], bool]) -> tp.Callable[[tp.Type], bool]:
+    """
+    Decorator marking a function as a type matcher, which `register_support_class` can register support against
+
+    Args:
+        fn (`Callable[[Type], bool]`): function which when given a type returns `True` if it should be handled by the support class it's registered with
+
+    Example usage::
+    ```py
+    @matcher
+    def is_rectangle(datatype: type):
+        return isinstance(datatype, type) and issubclass(datatype, Rectangle)
+
+    @register_support_class(is_rectangle)
+    class RectangleSupport(SupportInterface):
+        ...
+    ```
+    """
+    fn._pykachu_matcher = True
+    return fn
+
+def __is_typing_construct(data_type) -> bool:
+    # special forms (`Union`, `Literal`), aliases (`list[int]`, `List[int]`) and the like, which are callable but registered as keys
+    return type(data_type).__module__ in ("typing", "types", "typing_extensions")
 
 def register_support_class(data_type: type | tp.Callable[[tp.Type], bool]):
     """
     Decorator to regiser a serialize support for your datatype
 
     Args:
-        datatype (`type` | `Callable[[Type], bool]`): Register it against a type or a function which when given a type returns `True` if the decorated class can parse/serialize it
+        datatype (`type` | `Callable[[Type], bool]`): Register it against a type or a `matcher` decorated function which when given a type returns `True` if the decorated class can parse/serialize it
 
     Example usage::
     ```py
@@ -37,10 +74,26 @@ def register_support_class(data_type: type | tp.Callable[[tp.Type], bool]):
                 return value
             raise ValueError(f"{type(value)=} {value=} expected to be an int")
     ```
+
+    Raises:
+        ValueError: `data_type` is a function or other callable which isn't a type and isn't decorated with `matcher`
     """
-    global __GLOBAL_SUPPORT_REGISTER
+    is_matcher = getattr(data_type, '_pykachu_matcher', False)
+    if not is_matcher and callable(data_type) and not isinstance(data_type, type) and not __is_typing_construct(data_type):
+        raise ValueError(f"{data_type=} is neither a type nor a matcher, decorate it with `matcher` to register support for the types it matches")
     def wrapper(cls: tp.Type['SupportInterface']):
-        __GLOBAL_SUPPORT_REGISTER[data_type] = cls
+        entry = (cls.serialize, cls.parse)
+        __GLOBAL_SUPPORT_REGISTER[data_type] = entry
+        if is_matcher:
+            for index, (type_matcher, _) in enumerate(_CALLABLE_MATCHERS):
+                if type_matcher == data_type:
+                    _CALLABLE_MATCHERS[index] = (data_type, entry)
+                    break
+            else:
+                _CALLABLE_MATCHERS.append((data_type, entry))
+        if data_type in _LEAF_TYPES:
+            _LEAF_FASTPATH[data_type] = cls.parse
+        __invalidate_resolver_cache()
         return cls
     return wrapper
 
@@ -57,9 +110,90 @@ def deregister_support_class(data_type: type | tp.Callable[[tp.Type], bool]):
     parse(int, 10, True) # will fail because the serialization support was deregistered
     ```
     """
-    global __GLOBAL_SUPPORT_REGISTER
     if data_type in __GLOBAL_SUPPORT_REGISTER:
         del __GLOBAL_SUPPORT_REGISTER[data_type]
+        _CALLABLE_MATCHERS[:] = [(type_matcher, entry) for type_matcher, entry in _CALLABLE_MATCHERS if type_matcher != data_type]
+        _LEAF_FASTPATH.pop(data_type, None)
+        __invalidate_resolver_cache()
+
+def __invalidate_resolver_cache():
+    global _REGISTRY_VERSION
+    _REGISTRY_VERSION += 1
+    _RESOLVER_CACHE.clear()
+
+# data_type -> (data_type, result), the stored data_type is checked by identity (see the note on `_RESOLVER_CACHE`)
+_ORIGIN_CACHE: dict[tp.Any, tuple[tp.Any, tp.Any]] = {}
+_ARGS_CACHE: dict[tp.Any, tuple[tp.Any, tuple]] = {}
+# unions and `typing` aliases (`List[int]`) hash all of their args, which costs more than the lookup a cache entry saves
+_UNCACHED_ALIASES = frozenset({types.UnionType, type(tp.Union[int, str]), type(tp.List[int])})
+
+def _get_origin(data_type):
+    """
+    Cached `typing.get_origin`
+    """
+    if type(data_type) in _UNCACHED_ALIASES:
+        return tp.get_origin(data_type)
+    try:
+        cached = _ORIGIN_CACHE.get(data_type)
+    except TypeError:
+        # unhashable, e.g. Literal[[1, 2], 3]
+        return tp.get_origin(data_type)
+    if cached is not None and cached[0] is data_type:
+        return cached[1]
+    origin = tp.get_origin(data_type)
+    _ORIGIN_CACHE[data_type] = (data_type, origin)
+    return origin
+
+def _get_args(data_type) -> tuple:
+    """
+    Cached `typing.get_args`
+    """
+    if type(data_type) in _UNCACHED_ALIASES:
+        return tp.get_args(data_type)
+    try:
+        cached = _ARGS_CACHE.get(data_type)
+    except TypeError:
+        # unhashable, e.g. Literal[[1, 2], 3]
+        return tp.get_args(data_type)
+    if cached is not None and cached[0] is data_type:
+        return cached[1]
+    args = tp.get_args(data_type)
+    _ARGS_CACHE[data_type] = (data_type, args)
+    return args
+
+def _resolve(data_type) -> tp.Optional[_SupportEntry]:
+    """
+    Find the `(serialize, parse)` functions registered for `data_type`, `None` if there aren't any.
+
+    Lookup order is the type itself, then its origin (`list` for `list[int]`), then the callable matchers
+    (validated once in `register_support_class`).
+    Results are cached per `data_type` until the register changes, unhashable data types (e.g. `Literal[[1, 2], 3]`)
+    are resolved through their origin and the matchers on every call. Support classes may swap in a parse
+    function specialized for `data_type` through `_PARSE_SPECIALIZERS`.
+    """
+    try:
+        return _RESOLVER_CACHE[data_type]
+    except KeyError:
+        hashable = True
+    except TypeError:
+        hashable = False
+    register = __GLOBAL_SUPPORT_REGISTER
+    origin = _get_origin(data_type)
+    entry = register.get(data_type) if hashable else None
+    if entry is None:
+        entry = register.get(origin)
+    if entry is None:
+        for type_matcher, potential_entry in _CALLABLE_MATCHERS:
+            if type_matcher(data_type) or type_matcher(origin):
+                entry = potential_entry
+                break
+    if entry is not None:
+        specializer = _PARSE_SPECIALIZERS.get(entry[1])
+        if specializer is not None:
+            entry = specializer(data_type) or entry
+    if hashable:
+        _RESOLVER_CACHE[data_type] = entry
+    return entry
 
 def parse(data_type: tp.Type[T], value, strict: bool = False) -> T:
     """
@@ -85,31 +219,20 @@ def parse(data_type: tp.Type[T], value, strict: bool = False) -> T:
     parsed_rectangle.length, parsed_rectangle.width # 10.0, 5.5
     ```
     """
-    global __GLOBAL_SUPPORT_REGISTER
-    resolver = None
-    origin = tp.get_origin(data_type)
-    if data_type in __GLOBAL_SUPPORT_REGISTER:
-        resolver = __GLOBAL_SUPPORT_REGISTER[data_type]
-    else:
-        # if not origin:
-        #     # consider it any
-        #     return parse(tp.Any, value, strict)
-        if origin in __GLOBAL_SUPPORT_REGISTER:
-            resolver = __GLOBAL_SUPPORT_REGISTER[origin]
-    
-    if not resolver:
-        for matcher, potential_resolver in __GLOBAL_SUPPORT_REGISTER.items():
-            if callable(matcher) and __is_valid_callable(matcher) and (matcher(data_type) or matcher(origin)):
-                resolver = potential_resolver
-                break
-    
-    if not resolver:
+    try:
+        leaf_parse = _LEAF_FASTPATH.get(data_type)
+    except TypeError:
+        # unhashable, e.g. Literal[[1, 2], 3], can't be a leaf type
+        leaf_parse = None
+    if leaf_parse is not None:
+        return leaf_parse(data_type, value, strict)
+    entry = _resolve(data_type)
+    if entry is None:
         if strict:
             raise ValueError(f'no registered support class found for {data_type=}')
         else:
             return value
-    # print(f"Using {resolver=} for {data_type=} {value=}")
-    return resolver.parse(data_type, value, strict)
+    return entry[1](data_type, value, strict)
 
 def serialize(value):
     """
@@ -131,19 +254,105 @@ def serialize(value):
     serialize(rec) # {"length": 10.0, "width": 5.5}
     ```
     """
-    def default_handler(val):
-        global __GLOBAL_SUPPORT_REGISTER
-        resolver = None
-        if type(val) in __GLOBAL_SUPPORT_REGISTER:
-            resolver = __GLOBAL_SUPPORT_REGISTER[type(val)]
+    return _to_jsonable(value)
+
+def serialize_json(value) -> str:
+    """
+    This function serializes a python object straight to a json string
+
+    Args:
+        value (`Any`): A value to be serialized.
+
+    Returns:
+        str: json document of the serialized value
+
+    Example:
+    ```py
+    @dataclass
+    class Rectangle:
+        length: float
+        width: float
+    rec = Rectangle(length=10.0, width=5.5)
+    serialize_json(rec) # '{"length":10.0,"width":5.5}'
+    ```
+
+    Uses `orjson` to write the json when it is installed (`pip install pykachu[orjson]`), `json` otherwise.
+    Either way the output is the same: non-ascii text is written as is, and `nan` / `inf` floats are rejected with
+    a `ValueError` since json can't represent them. Only the spelling of numbers may differ (`1e16` vs `1e+16`).
+    """
+    tree = serialize(value)
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(tree)
+        except orjson.JSONEncodeError:
+            # e.g. integers over 64 bits, which json handles
+            pass
         else:
-            for key, v in __GLOBAL_SUPPORT_REGISTER.items():
-                if callable(key) and __is_valid_callable(key) and key(type(val)):
-                    resolver = v
-        if not resolver:
-            raise ValueError(f'no registered support class found for {type(val)=} {val=}')
-        return resolver.serialize(val)
-    return json.loads(json.dumps(value, default=default_handler))
+            # orjson writes nan / inf as null, so only output with a null in it can hide one
+            if b"null" in encoded:
+                __reject_non_finite(tree)
+            return encoded.decode()
+    return json.dumps(tree, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+
+def __reject_non_finite(tree):
+    """
+    Raise the `ValueError` json raises with `allow_nan=False` if the serialized `tree` holds a `nan` / `inf` float
+    """
+    pending = [tree]
+    while pending:
+        node = pending.pop()
+        node_type = type(node)
+        if node_type is dict:
+            pending.extend(node.values())
+        elif node_type is list:
+            pending.extend(node)
+        elif node_type is float and not math.isfinite(node):
+            raise ValueError(f"Out of range float values are not JSON compliant: {node!r}")
+
+def _default_handler(value):
+    """
+    Serialize a value json can't represent with its registered support class, walking the result unless the support
+    class is one of `_JSONABLE_SERIALIZERS`
+    """
+    value_type = type(value)
+    entry = _resolve(value_type)
+    if entry is None:
+        raise ValueError(f'no registered support class found for type(val)={value_type!r} val={value!r}')
+    serialized = entry[0](value)
+    if entry[0] in _JSONABLE_SERIALIZERS:
+        return serialized
+    return _to_jsonable(serialized)
+
+def _to_jsonable(value):
+    """
+    Walk `value` once and build its json compatible tree, values json can't represent go through their support class.
+
+    Unlike `json.dumps`, dict keys go through support classes too, so `{Color.RED: 1}` or `{date(2020, 1, 1): 1}`
+    serialize instead of raising `TypeError`, as long as the serialized key is a str, int, float, bool or None.
+    """
+    if type(value) in _JSON_PRIMITIVES:
+        return value
+    if isinstance(value, dict):
+        return {__to_json_key(_to_jsonable(key)): _to_jsonable(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        if _JSON_PRIMITIVES.issuperset(map(type, value)):
+            return list(value)
+        return [_to_jsonable(item) for item in value]
+    # subclasses of json primitives (IntEnum, StrEnum, ...) are written out by json as the plain primitive
+    if isinstance(value, str):
+        return str.__str__(value)
+    if isinstance(value, int):
+        return int.__int__(value)
+    if isinstance(value, float):
+        return float.__float__(value)
+    return _default_handler(value)
+
+def __to_json_key(key) -> str:
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (int, float)):
+        return json.dumps(key)
+    raise TypeError(f'keys must be str, int, float, bool or None, not {type(key).__name__}')
 
 class SupportInterface(ABC):
     """
@@ -4,12 +4,20 @@ Existing Supported Datatype Implementations
 Contains the default implementation for serialization and parsing for out of the box supported data types
 """
 
-from .pykachu import register_support_class, SupportInterface, serialize, parse
-from dataclasses import is_dataclass, asdict, fields
+from .pykachu import register_support_class, SupportInterface, serialize, parse, _resolve, _get_origin, _get_args, _JSON_PRIMITIVES, _JSONABLE_SERIALIZERS, _PARSE_SPECIALIZERS, _SupportEntry
+from . import pykachu as _pykachu
+from dataclasses import fields
 from datetime import date, datetime
-from .helpers import is_enum
+from .helpers import is_enum, is_dataclass
+from itertools import repeat
 from enum import Enum
 import typing as tp
+import inspect
+import types
+import sys
+
+# containers accepted as input for list / set / tuple fields
+_ITERABLE_CONCRETE = (list, tuple, set, frozenset)
 
 @register_support_class(int)
 class IntSupport(SupportInterface):
@@ -109,6 +117,38 @@ class BoolSupport(SupportInterface):
             return value
         raise ValueError(f"{type(value)=} {value=} expected to be an bool")
 
+# parse functions of the leaf supports above, which in strict mode only accept instances of their type
+_STRICT_LEAF_PARSERS = {
+    int: IntSupport.parse,
+    float: FloatSupport.parse,
+    str: StrSupport.parse,
+    bool: BoolSupport.parse,
+}
+
+# data_type -> (register version, data_type, args, has NoneType arg, value type -> (args to try, arg sure to succeed))
+# data_type is checked by identity since unions compare equal regardless of arg order (see `pykachu._RESOLVER_CACHE`)
+_UNION_DISPATCH: dict[tp.Any, tuple[int, tp.Any, tuple, bool, dict[type, tuple[tuple, tp.Optional[tuple]]]]] = {}
+
+def _build_union_dispatch(args: tuple, value_type: type) -> tuple[tuple, tp.Optional[tuple]]:
+    """
+    Narrow the union `args` down to the `(arg, parse)` pairs that can accept a value of `value_type`, in order.
+
+    Args without a support class, or strict leaf types `value_type` isn't an instance of, would always fail and are
+    dropped. Trying stops at the first strict leaf `value_type` is an instance of, since that one can't fail.
+    """
+    candidates = []
+    for arg in args:
+        entry = _resolve(arg)
+        if entry is None:
+            continue
+        if isinstance(arg, type) and _STRICT_LEAF_PARSERS.get(arg) is entry[1]:
+            if issubclass(value_type, arg):
+                return tuple(candidates), (arg, entry[1])
+            continue
+        candidates.append((arg, entry[1]))
+    return tuple(candidates), None
+
+@register_support_class(types.UnionType)
 @register_support_class(tp.Union)
 class UnionSupport(SupportInterface):
     """
@@ -121,20 +161,73 @@ class UnionSupport(SupportInterface):
     
     @staticmethod
     def parse(data_type: type, value, strict: bool):
-        args = tp.get_args(data_type)
-        if not args:
-            raise ValueError(f"Invalid {data_type=}. Union type needs args")
-        if type(None) in args and value is None:
+        version = _pykachu._REGISTRY_VERSION
+        try:
+            cached = _UNION_DISPATCH.get(data_type)
+            hashable = True
+        except TypeError:
+            # unions over unhashable types, e.g. Literal[[1, 2], 3] | None, are dispatched without caching
+            cached = None
+            hashable = False
+        if cached is None or cached[0] != version or cached[1] is not data_type:
+            args = _get_args(data_type)
+            if not args:
+                raise ValueError(f"Invalid {data_type=}. Union type needs args")
+            cached = (version, data_type, args, type(None) in args, {})
+            if hashable:
+                _UNION_DISPATCH[data_type] = cached
+        _, _, args, has_none, by_type = cached
+        if has_none and value is None:
             return value
-        for arg in args:
+        value_type = type(value)
+        dispatch = by_type.get(value_type)
+        if dispatch is None:
+            dispatch = by_type[value_type] = _build_union_dispatch(args, value_type)
+        candidates, settled = dispatch
+        for arg, arg_parse in candidates:
             try:
-                return parse(arg, value, True)
-            except:
+                return arg_parse(arg, value, True)
+            except Exception:
                 continue
+        if settled is not None:
+            return settled[1](settled[0], value, True)
+        if strict:
+            raise ValueError(f"{type(value)=} {value=} did not match any types {args=}")
+        return value
+
+# equality keyed, equal Literals have the same set of args
+_LITERAL_SETS: dict[tp.Any, frozenset] = {}
+# stands in for the frozenset of a Literal with unhashable args, e.g. Literal[[1, 2], 3]
+_UNHASHABLE_LITERAL = object()
+
+def _parse_optional(data_type: type, value, strict: bool):
+    """
+    Parse `Optional[T]` without the union dispatch, same results as `UnionSupport.parse`
+    """
+    if value is None:
+        return value
+    # T is read from data_type on every call, the resolver cache hands this function to every union equal to data_type
+    args = tp.get_args(data_type)
+    inner = args[1] if args[0] is type(None) else args[0]
+    try:
+        return parse(inner, value, True)
+    except Exception:
         if strict:
             raise ValueError(f"{type(value)=} {value=} did not match any types {args=}")
         return value
 
+def _specialize_optional(data_type) -> tp.Optional[_SupportEntry]:
+    """
+    `_parse_optional` for `Optional[T]`, `None` for any other union
+    """
+    args = _get_args(data_type)
+    none_type = type(None)
+    if len(args) != 2 or none_type not in args or _resolve(none_type) is not None:
+        return None
+    return UnionSupport.serialize, _parse_optional
+
+_PARSE_SPECIALIZERS[UnionSupport.parse] = _specialize_optional
+
 @register_support_class(tp.Literal)
 class LiteralSupport(SupportInterface):
     """
@@ -147,18 +240,56 @@ class LiteralSupport(SupportInterface):
     
     @staticmethod
     def parse(data_type: type, value, strict: bool):
-        args = tp.get_args(data_type)
-        if not args:
-            raise ValueError(f"Invalid {data_type=}. Literal type needs args")
-        if type(None) in args and value is None:
-            return value
-        for arg in args:
-            if value == arg:
-                return value
+        try:
+            literal_set = _LITERAL_SETS.get(data_type)
+        except TypeError:
+            # the Literal hashes its args, so it can't be a cache key either
+            literal_set = _UNHASHABLE_LITERAL
+        if literal_set is None:
+            args = _get_args(data_type)
+            if not args:
+                raise ValueError(f"Invalid {data_type=}. Literal type needs args")
+            try:
+                literal_set = _LITERAL_SETS[data_type] = frozenset(args)
+            except TypeError:
+                literal_set = _UNHASHABLE_LITERAL
+        if literal_set is _UNHASHABLE_LITERAL:
+            for arg in _get_args(data_type):
+                if value == arg:
+                    return value
+        else:
+            try:
+                if value in literal_set:
+                    return value
+            except TypeError:
+                # an unhashable value can't equal any of the hashable args
+                pass
         if strict:
-            raise ValueError(f"{type(value)=} {value=} did not match any types {args=}")
+            raise ValueError(f"{type(value)=} {value=} did not match any types args={_get_args(data_type)}")
         return value
 
+def _serialize_items(value) -> list:
+    """
+    Serialize every item of `value` into a list, copying it as is when it only holds json primitives
+    """
+    if _JSON_PRIMITIVES.issuperset(map(type, value)):
+        return list(value)
+    return [serialize(item) for item in value]
+
+def _parse_items(arg, value, strict: bool) -> list:
+    """
+    Parse every item of `value` as `arg`, resolving the parse function for `arg` once for all items
+    """
+    entry = _resolve(arg)
+    if entry is None:
+        return [parse(arg, item, strict) for item in value]
+    arg_parse = entry[1]
+    if isinstance(arg, type) and _STRICT_LEAF_PARSERS.get(arg) is arg_parse:
+        # leaf parsers hand back the item unchanged unless it's invalid in strict mode
+        if not strict or all(map(isinstance, value, repeat(arg))):
+            return list(value)
+    return [arg_parse(arg, item, strict) for item in value]
+
 @register_support_class(list)
 class ListSupport(SupportInterface):
     """
@@ -167,22 +298,21 @@ class ListSupport(SupportInterface):
 
     @staticmethod
     def serialize(value):
-        return [serialize(item) for item in value]
+        return _serialize_items(value)
     
     @staticmethod
     def parse(data_type: type, value, strict: bool):
-        if not isinstance(value, tp.Iterable):
+        if not isinstance(value, _ITERABLE_CONCRETE):
             if strict:
                 raise ValueError(f"{type(value)=} {value=} invalid for {data_type=}")
             else:
                 return value
-        arg = tp.get_args(data_type)
+        arg = _get_args(data_type)
         if not arg:
             return [item for item in value]
         if len(arg) != 1:
             raise ValueError(f"Invalid {data_type=} with {arg=}. list should only have =1 arg")
-        arg = arg[0]
-        return [parse(arg, item, strict) for item in value]
+        return _parse_items(arg[0], value, strict)
 
 @register_support_class(set)
 class SetSupport(SupportInterface):
@@ -192,22 +322,21 @@ class SetSupport(SupportInterface):
 
     @staticmethod
     def serialize(value):
-        return [serialize(item) for item in value]
+        return _serialize_items(value)
     
     @staticmethod
     def parse(data_type: type, value, strict: bool):
-        if not isinstance(value, tp.Iterable):
+        if not isinstance(value, _ITERABLE_CONCRETE):
             if strict:
                 raise ValueError(f"{type(value)=} {value=} invalid for {data_type=}")
             else:
                 return value
-        arg = tp.get_args(data_type)
+        arg = _get_args(data_type)
         if not arg:
             return set([item for item in value])
         if len(arg) != 1:
             raise ValueError(f"Invalid {data_type=} with {arg=}. list should only have =1 arg")
-        arg = arg[0]
-        return set([parse(arg, item, strict) for item in value])
+        return set(_parse_items(arg[0], value, strict))
 
 @register_support_class(tuple)
 class TupleSupport(SupportInterface):
@@ -217,43 +346,28 @@ class TupleSupport(SupportInterface):
 
     @staticmethod
     def serialize(value):
-        return [serialize(item) for item in value]
+        return _serialize_items(value)
     
     @staticmethod
     def parse(data_type: type, value, strict: bool):
-        if not isinstance(value, tp.Iterable):
+        if not isinstance(value, _ITERABLE_CONCRETE):
             if strict:
                 raise ValueError(f"{type(value)=} {value=} invalid for {data_type=}")
             else:
                 return value
-        args = tp.get_args(data_type)
+        args = _get_args(data_type)
         if not args:
             return tuple(value)
+        if len(args) == 2 and args[1] is Ellipsis:
+            return tuple(_parse_items(args[0], value, strict))
         if len(value) != len(args):
             if strict:
                 raise ValueError(f"{args=} {value=} len mismatch for tuple")
-        index_args = 0
-        index_items = 0
-        value = [item for item in value]
-        final = []
-        while index_items < len(value):
-            arg = ...
-            item = ...
-            if index_args < len(args):
-                arg = args[index_args]
-                index_args+=1
-            if index_items < len(value):
-                item = value[index_items]
-                index_items+=1
-            if arg is Ellipsis and item is Ellipsis:
-                break
-            elif arg is not Ellipsis and item is not Ellipsis:
-                final.append(parse(arg, item, strict))
-            elif arg is Ellipsis and item is not Ellipsis:
-                final.append(item)
-            else:
-                raise ValueError(f"wtf i don't know what to do, i don't think this should ever happen. bachao bachao")
-        return tuple(final)
+        parsed = tuple(parse(arg, item, strict) for arg, item in zip(args, value))
+        if len(value) > len(args):
+            # loosely parsed, items past the declared args are kept as they are
+            parsed += tuple(value)[len(args):]
+        return parsed
 
 @register_support_class(dict)
 class DictSupport(SupportInterface):
@@ -272,7 +386,7 @@ class DictSupport(SupportInterface):
                 raise ValueError(f"{type(value)=} {value=} invalid for {data_type=}")
             else:
                 return value
-        args = tp.get_args(data_type)
+        args = _get_args(data_type)
         if not args:
             return value
         if len(args) != 2:
@@ -281,6 +395,20 @@ class DictSupport(SupportInterface):
             parse(args[0], key, strict): parse(args[1], val, strict) for key, val in value.items()
         }
 
+# enum class -> whether any of its members has an unhashable value, which only a scan over the members can find
+_ENUM_HAS_UNHASHABLE: dict[type, bool] = {}
+
+def _has_unhashable_values(data_type: tp.Type[Enum]) -> bool:
+    """
+    `True` if any member of `data_type` has an unhashable value
+    """
+    for enumeration in data_type._member_map_.values():
+        try:
+            hash(enumeration.value)
+        except TypeError:
+            return True
+    return False
+
 @register_support_class(is_enum)
 class EnumSupport(SupportInterface):
     """
@@ -296,13 +424,75 @@ class EnumSupport(SupportInterface):
     
     @staticmethod
     def parse(data_type: type, value, strict: bool):
-        for enumeration in data_type:
-            if enumeration.name == value or enumeration.value == value:
-                return enumeration
+        try:
+            enumeration = data_type._member_map_.get(value)
+            if enumeration is None:
+                enumeration = data_type._value2member_map_.get(value)
+        except TypeError:
+            # unhashable value
+            enumeration = None
+        if enumeration is not None:
+            return enumeration
+        has_unhashable = _ENUM_HAS_UNHASHABLE.get(data_type)
+        if has_unhashable is None:
+            has_unhashable = _ENUM_HAS_UNHASHABLE[data_type] = _has_unhashable_values(data_type)
+        if has_unhashable:
+            # members with unhashable values are missing from _value2member_map_
+            for enumeration in data_type:
+                if enumeration.value == value:
+                    return enumeration
         if strict:
             raise ValueError(f"{value=} invalid for {data_type=}")
         return value
 
+# equality keyed, a dataclass is only equal to itself and the fields of its equal generic aliases come from it
+_FIELDS_CACHE: dict[type, list[tuple[str, tp.Any]]] = {}
+
+def _cached_fields(data_type: type) -> list[tuple[str, tp.Any]]:
+    """
+    `(name, type)` of every field of the dataclass `data_type`, with string / forward reference annotations resolved
+    """
+    cached = _FIELDS_CACHE.get(data_type)
+    if cached is None:
+        cls = _get_origin(data_type) or data_type
+        try:
+            hints = tp.get_type_hints(cls, include_extras=True)
+        except Exception:
+            # an unresolvable forward reference, resolve the other fields on their own
+            hints = _field_type_hints(cls)
+        cached = _FIELDS_CACHE[data_type] = [(field.name, hints.get(field.name, field.type)) for field in fields(data_type)]
+    return cached
+
+def _field_type_hints(cls: type) -> dict[str, tp.Any]:
+    """
+    `typing.get_type_hints` of `cls` evaluated one annotation at a time, annotations which can't be resolved are left out
+    """
+    hints = {}
+    for base in reversed(cls.__mro__):
+        module = getattr(sys.modules.get(base.__module__), '__dict__', {})
+        for name, annotation in inspect.get_annotations(base).items():
+            # a class holding just this annotation, evaluated in the namespaces `get_type_hints` would use for `base`
+            holder = type(base.__name__, (), {'__annotations__': {name: annotation}})
+            try:
+                hints[name] = tp.get_type_hints(holder, dict(vars(base)), module, include_extras=True)[name]
+            except Exception:
+                hints.pop(name, None)
+    return hints
+
+# data_type -> (register version it was built against, (name, parse, type) of every field)
+# equality keyed like `_FIELDS_CACHE`, everything in it is derived from `_cached_fields`
+_DATACLASS_FIELDS: dict[type, tuple[int, tuple[tuple[str, tp.Callable[[type, tp.Any, bool], tp.Any], tp.Any], ...]]] = {}
+
+def _bind_dataclass_fields(data_type: type) -> tuple[tuple[str, tp.Callable[[type, tp.Any, bool], tp.Any], tp.Any], ...]:
+    """
+    `(name, parse, type)` of every field of `data_type`, with the parse function for each field resolved up front
+    """
+    bound = []
+    for name, field_type in _cached_fields(data_type):
+        entry = _resolve(field_type)
+        bound.append((name, parse if entry is None else entry[1], field_type))
+    return tuple(bound)
+
 @register_support_class(is_dataclass)
 class DataclassSupport(SupportInterface):
     """
@@ -311,7 +501,7 @@ class DataclassSupport(SupportInterface):
 
     @staticmethod
     def serialize(value):
-        return serialize(asdict(value))
+        return {name: serialize(getattr(value, name)) for name, _ in _cached_fields(type(value))}
     
     @staticmethod
     def parse(data_type: type, value, strict: bool):
@@ -320,14 +510,13 @@ class DataclassSupport(SupportInterface):
                 raise ValueError(f"{type(value)=} {value=} invalid for {data_type=}")
             else:
                 return value
-        all_fields = fields(data_type)
-        # print(f"{all_fields=} {data_type=}")
-        final_map = {}
-        for field in all_fields:
-            if field.name in value:
-                # print(f"{field.name=} {field.type=}")
-                final_map[field.name] = parse(field.type, value[field.name], strict)
-        return data_type(**final_map)
+        version = _pykachu._REGISTRY_VERSION
+        cached = _DATACLASS_FIELDS.get(data_type)
+        if cached is None or cached[0] != version:
+            cached = _DATACLASS_FIELDS[data_type] = (version, _bind_dataclass_fields(data_type))
+        return data_type(**{name: field_parse(field_type, value[name], strict) for name, field_parse, field_type in cached[1] if name in value})
+
+_JSONABLE_SERIALIZERS.update((ListSupport.serialize, SetSupport.serialize, TupleSupport.serialize, DataclassSupport.serialize))
 
 @register_support_class(datetime)
 class DatetimeSupport(SupportInterface):
@@ -0,0 +1,347 @@
+import json
+import typing as tp
+import unittest
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from enum import Enum, IntEnum, StrEnum
+from unittest import mock
+from pykachu import SupportInterface, deregister_support_class, matcher, parse, register_support_class, serialize, serialize_json
+from pykachu import pykachu as core
+from pykachu.support import DataclassSupport
+
+
+class OptionalTest(unittest.TestCase):
+
+    def test_none_and_value(self):
+        self.assertIsNone(parse(tp.Optional[int], None, True))
+        self.assertEqual(parse(int | None, 5, True), 5)
+        self.assertEqual(parse(tp.Optional[int], "x"), "x")
+        with self.assertRaises(ValueError):
+            parse(tp.Optional[int], "x", True)
+
+    def test_inner_union_order_is_kept(self):
+        # both aliases compare equal, but the inner unions try their args in a different order
+        datetime_first = list[tp.Union[datetime, str]] | None
+        str_first = list[tp.Union[str, datetime]] | None
+        self.assertEqual(parse(datetime_first, ["2020-01-01"], True), [datetime(2020, 1, 1)])
+        self.assertEqual(parse(str_first, ["2020-01-01"], True), ["2020-01-01"])
+        self.assertEqual(parse(datetime_first, ["2020-01-01"], True), [datetime(2020, 1, 1)])
+
+
+def _can_build_unhashable_union():
+    try:
+        tp.Optional[tp.Literal[[1, 2], 3]]
+    except TypeError:
+        return False
+    return True
+
+
+class UnionTest(unittest.TestCase):
+
+    def test_pep_604_unions(self):
+        self.assertIsNone(parse(int | None, None, True))
+        self.assertEqual(parse(int | str, "a", True), "a")
+        self.assertEqual(parse(list[int] | None, [1], True), [1])
+        with self.assertRaises(ValueError):
+            parse(int | None, "a", True)
+
+    def test_arg_order_is_kept_across_equal_unions(self):
+        for _ in range(2):
+            self.assertEqual(parse(tp.Union[datetime, str], "2020-01-01", True), datetime(2020, 1, 1))
+            self.assertEqual(parse(tp.Union[str, datetime], "2020-01-01", True), "2020-01-01")
+            self.assertEqual(parse(datetime | str, "2020-01-01", True), datetime(2020, 1, 1))
+            self.assertEqual(parse(str | datetime, "2020-01-01", True), "2020-01-01")
+
+    def test_numbers(self):
+        self.assertEqual(parse(tp.Union[float, int], 1, True), 1)
+        self.assertIs(parse(tp.Union[int, bool], True, True), True)
+
+
+class LiteralTest(unittest.TestCase):
+
+    def test_membership(self):
+        self.assertEqual(parse(tp.Literal["a", "b"], "b", True), "b")
+        self.assertEqual(parse(tp.Literal["a"], ["a"]), ["a"])
+        with self.assertRaises(ValueError):
+            parse(tp.Literal["a", "b"], "c", True)
+
+    def test_unhashable_args(self):
+        literal = tp.Literal[[1, 2], 3]
+        self.assertEqual(parse(literal, 3, True), 3)
+        self.assertEqual(parse(literal, [1, 2], True), [1, 2])
+        self.assertEqual(parse(list[literal], [3, [1, 2]], True), [3, [1, 2]])
+        with self.assertRaises(ValueError):
+            parse(literal, 4, True)
+
+    @unittest.skipUnless(_can_build_unhashable_union(), "typing can't build unions of unhashable Literals here")
+    def test_unhashable_args_in_union(self):
+        literal = tp.Literal[[1, 2], 3]
+        self.assertIsNone(parse(tp.Optional[literal], None, True))
+        self.assertEqual(parse(tp.Optional[literal], [1, 2], True), [1, 2])
+        self.assertEqual(parse(tp.Union[literal, int], 7, True), 7)
+
+
+class SerializeJsonTest(unittest.TestCase):
+
+    def assert_same_on_both_backends(self, check):
+        if core.orjson is not None:
+            with self.subTest(backend="orjson"):
+                check()
+        with self.subTest(backend="json"), mock.patch.object(core, "orjson", None):
+            check()
+
+    def test_output(self):
+        def check():
+            value = {"name": "é", "none": None, "big": 2 ** 70, "items": (1, 2.5)}
+            encoded = serialize_json(value)
+            self.assertEqual(encoded, '{"name":"é","none":null,"big":1180591620717411303424,"items":[1,2.5]}')
+            self.assertEqual(json.loads(encoded), {"name": "é", "none": None, "big": 2 ** 70, "items": [1, 2.5]})
+        self.assert_same_on_both_backends(check)
+
+    def test_non_finite_floats_are_rejected(self):
+        def check():
+            for number in (float("nan"), float("inf"), float("-inf")):
+                with self.assertRaises(ValueError):
+                    serialize_json({"x": number})
+                with self.assertRaises(ValueError):
+                    serialize_json([None, number])
+        self.assert_same_on_both_backends(check)
+
+
+class Square:
+    def __init__(self, length: int):
+        self.length = length
+
+
+class BigSquare(Square):
+    pass
+
+
+class SquareSupport(SupportInterface):
+
+    @staticmethod
+    def serialize(value: Square):
+        return {"l": value.length}
+
+    @staticmethod
+    def parse(data_type: tp.Type[Square], value, strict: bool):
+        return data_type(value["l"])
+
+
+class MatcherTest(unittest.TestCase):
+
+    def test_decorated_matcher(self):
+        @matcher
+        def is_square(datatype: type):
+            return isinstance(datatype, type) and issubclass(datatype, Square)
+
+        register_support_class(is_square)(SquareSupport)
+        try:
+            self.assertEqual(serialize([BigSquare(2)]), [{"l": 2}])
+            parsed = parse(BigSquare, {"l": 3}, True)
+            self.assertIsInstance(parsed, BigSquare)
+            self.assertEqual(parsed.length, 3)
+        finally:
+            deregister_support_class(is_square)
+        with self.assertRaises(ValueError):
+            serialize(Square(2))
+
+    def test_undecorated_matcher_is_rejected(self):
+        def is_square(datatype: type):
+            return isinstance(datatype, type) and issubclass(datatype, Square)
+
+        with self.assertRaises(ValueError):
+            register_support_class(is_square)
+        with self.assertRaises(ValueError):
+            register_support_class(lambda datatype: datatype is Square)
+
+    def test_types_and_typing_constructs_are_keys(self):
+        for data_type in (Square, tp.Literal, tp.Union, list[int]):
+            register_support_class(data_type)
+
+
+@dataclass
+class Node:
+    # string annotations, as written with `from __future__ import annotations`
+    name: "str"
+    created: "tp.Optional[datetime]"
+    children: "list[Node]" = field(default_factory=list)
+
+
+@dataclass
+class Event:
+    when: "datetime"
+    # never defined, so only this field keeps its annotation as written
+    other: "Undefined"
+    count: int = 0
+
+
+class DataclassTest(unittest.TestCase):
+
+    def test_forward_ref_round_trip(self):
+        node = Node("root", datetime(2020, 1, 1), [Node("leaf", None)])
+        serialized = serialize(node)
+        self.assertEqual(serialized, {
+            "name": "root",
+            "created": "2020-01-01T00:00:00",
+            "children": [{"name": "leaf", "created": None, "children": []}],
+        })
+        self.assertEqual(parse(Node, serialized, True), node)
+
+    def test_unresolvable_forward_ref_only_affects_its_field(self):
+        self.assertEqual(parse(Event, {"when": "2020-01-01", "other": "x", "count": 2}), Event(datetime(2020, 1, 1), "x", 2))
+        with self.assertRaises(ValueError):
+            parse(Event, {"when": "2020-01-01", "other": "x"}, True)
+
+    def test_support_class_returns_serialized_fields(self):
+        node = Node("root", datetime(2020, 1, 1), [Node("leaf", None)])
+        self.assertEqual(DataclassSupport.serialize(node), serialize(node))
+        json.dumps(DataclassSupport.serialize(node))
+
+    def test_missing_fields_use_defaults(self):
+        self.assertEqual(parse(Node, {"name": "x", "created": None}, True), Node("x", None))
+
+    def test_strict_field_error(self):
+        with self.assertRaises(ValueError):
+            parse(Node, {"name": 1, "created": None}, True)
+
+
+class ContainerTest(unittest.TestCase):
+
+    def test_concrete_containers_are_accepted(self):
+        for value in ([1, 2], (1, 2), {1, 2}, frozenset({1, 2})):
+            with self.subTest(value=value):
+                self.assertEqual(sorted(parse(list[int], value, True)), [1, 2])
+                self.assertEqual(parse(set[int], value, True), {1, 2})
+                self.assertEqual(sorted(parse(tuple[int, ...], value, True)), [1, 2])
+
+    def test_other_iterables_are_rejected(self):
+        generator = (item for item in [1, 2])
+        for value in ("ab", {"a": 1}, generator):
+            for data_type in (list[str], set[str], tuple[str, ...]):
+                with self.subTest(value=value, data_type=data_type):
+                    with self.assertRaises(ValueError):
+                        parse(data_type, value, True)
+                    self.assertIs(parse(data_type, value), value)
+        # the generator wasn't consumed
+        self.assertEqual(list(generator), [1, 2])
+
+    def test_items_are_parsed(self):
+        self.assertEqual(parse(list[datetime], ["2020-01-01"], True), [datetime(2020, 1, 1)])
+        self.assertEqual(parse(list[int], [1, "2"]), [1, "2"])
+        with self.assertRaises(ValueError):
+            parse(list[int], [1, "2"], True)
+
+
+class TupleTest(unittest.TestCase):
+
+    def test_variadic_round_trip(self):
+        value = (datetime(2020, 1, 1), datetime(2021, 2, 2), datetime(2022, 3, 3))
+        serialized = serialize(value)
+        self.assertEqual(serialized, ["2020-01-01T00:00:00", "2021-02-02T00:00:00", "2022-03-03T00:00:00"])
+        self.assertEqual(parse(tuple[datetime, ...], serialized, True), value)
+        for length in (0, 1, 2, 5):
+            with self.subTest(length=length):
+                self.assertEqual(parse(tuple[int, ...], list(range(length)), True), tuple(range(length)))
+        with self.assertRaises(ValueError):
+            parse(tuple[int, ...], [1, "2", 3], True)
+
+    def test_fixed(self):
+        self.assertEqual(parse(tuple[int, datetime], [1, "2020-01-01"], True), (1, datetime(2020, 1, 1)))
+        with self.assertRaises(ValueError):
+            parse(tuple[int, str], [1], True)
+        with self.assertRaises(ValueError):
+            parse(tuple[int, str], [1, "a", 2], True)
+        # loosely parsed, extra items are kept as they are
+        self.assertEqual(parse(tuple[int, str], [1, "a", 2]), (1, "a", 2))
+
+
+class Color(Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class Size(IntEnum):
+    SMALL = 1
+
+
+class Shape(StrEnum):
+    ROUND = "round"
+
+
+@dataclass(frozen=True)
+class Point:
+    x: int
+
+
+class SerializeTest(unittest.TestCase):
+
+    def test_primitive_subclasses_become_primitives(self):
+        serialized = serialize([Size.SMALL, Shape.ROUND])
+        self.assertEqual(serialized, [1, "round"])
+        self.assertIs(type(serialized[0]), int)
+        self.assertIs(type(serialized[1]), str)
+
+    def test_dict_keys_go_through_support_classes(self):
+        value = {Color.RED: 1, Size.SMALL: 2, Shape.ROUND: 3, date(2020, 1, 1): 4, None: 5, 2.5: 6, False: 7}
+        self.assertEqual(serialize(value), {
+            "RED": 1,
+            "1": 2,
+            "round": 3,
+            "2020-01-01": 4,
+            "null": 5,
+            "2.5": 6,
+            "false": 7,
+        })
+
+    def test_dict_keys_must_serialize_to_primitives(self):
+        with self.assertRaises(TypeError):
+            serialize({Point(1): 1})
+        with self.assertRaises(ValueError):
+            serialize({object(): 1})
+
+    def test_containers(self):
+        self.assertEqual(serialize({"a": (1, {2}), "b": [Point(3)]}), {"a": [1, [2]], "b": [{"x": 3}]})
+
+
+class Level(IntEnum):
+    OFF = 0
+    LOW = 1
+    MINIMUM = 1
+
+
+class Point2D(Enum):
+    ORIGIN = [0, 0]
+    UNIT = (1, 1)
+
+
+class EnumTest(unittest.TestCase):
+
+    def test_name_and_value_hits(self):
+        self.assertIs(parse(Color, "RED", True), Color.RED)
+        self.assertIs(parse(Color, "blue", True), Color.BLUE)
+
+    def test_falsy_member(self):
+        self.assertIs(parse(Level, 0, True), Level.OFF)
+        self.assertIs(parse(Level, "OFF", True), Level.OFF)
+
+    def test_alias(self):
+        self.assertIs(parse(Level, "MINIMUM", True), Level.LOW)
+        self.assertIs(parse(Level, 1, True), Level.LOW)
+
+    def test_unhashable_value(self):
+        self.assertIs(parse(Point2D, [0, 0], True), Point2D.ORIGIN)
+        self.assertIs(parse(Point2D, (1, 1), True), Point2D.UNIT)
+        self.assertIs(parse(Point2D, "UNIT", True), Point2D.UNIT)
+
+    def test_miss(self):
+        for data_type, value in ((Color, "green"), (Color, ["red"]), (Level, 2), (Point2D, [1, 1])):
+            with self.subTest(data_type=data_type, value=value):
+                with self.assertRaises(ValueError):
+                    parse(data_type, value, True)
+                self.assertEqual(parse(data_type, value), value)
+        self.assertEqual(parse(tp.Union[Color, str], "green", True), "green")
+
+
+if __name__ == "__main__":
+    unittest.main()